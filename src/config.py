@@ -14,5 +14,12 @@ EMBED_MODEL = "all-MiniLM-L6-v2"
 FAISS_INDEX_PATH = MODELS_DIR / "faiss_index.idx"
 EMBEDDINGS_NPY = MODELS_DIR / "embeddings.npy"
 DOCS_CHUNKS_JSON = MODELS_DIR / "docs_metadata.json"
+BM25_INDEX_JSON = MODELS_DIR / "bm25_index.json"
+
+# OCR / text extraction for image and PDF invoices
+OCR_BACKEND = os.environ.get("OCR_BACKEND", "tesseract")  # "tesseract" or "stub"
+OCR_CACHE_DIR = MODELS_DIR / "ocr_cache"
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", os.cpu_count() or 1))
+OCR_TIMEOUT_S = float(os.environ.get("OCR_TIMEOUT_S", 60))
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")  # Optional
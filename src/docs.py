@@ -1,17 +1,25 @@
 import json
 from pathlib import Path
 from .config import DOCS_RAW_DIR, DOCS_EXTRACTED_DIR, DOCS_CHUNKS_JSON
+from .extract import IMAGE_SUFFIXES, PDF_SUFFIXES, extract_documents
 DOCS_EXTRACTED_DIR.mkdir(parents=True, exist_ok=True)
 
-def prepare_docs_from_raw(metadata_json_path):
+def prepare_docs_from_raw(metadata_json_path, extractor=None):
     meta = json.load(open(metadata_json_path))
 
+    # OCR every image/PDF up front in one parallel, cached pass
+    to_extract = sorted({DOCS_RAW_DIR / m['file'] for m in meta
+                         if (DOCS_RAW_DIR / m['file']).suffix.lower() in IMAGE_SUFFIXES | PDF_SUFFIXES})
+    extracted, extraction_stats = extract_documents(to_extract, extractor=extractor)
+
     chunks = []
 
     for m in meta:
         raw_file = DOCS_RAW_DIR / m['file']
         if raw_file.suffix == ".txt":
             text = open(raw_file, encoding='utf-8').read()
+        elif raw_file in extracted:
+            text = extracted[raw_file]
         else:
             text = f"[PLACEHOLDER TEXT for {m['file']}]"
 
@@ -28,4 +36,4 @@ def prepare_docs_from_raw(metadata_json_path):
     with open(DOCS_CHUNKS_JSON, "w") as f:
         json.dump(chunks, f, indent=2)
 
-    return {"chunks": len(chunks), "saved_to": str(DOCS_CHUNKS_JSON)}
+    return {"chunks": len(chunks), "saved_to": str(DOCS_CHUNKS_JSON), "extraction": extraction_stats}
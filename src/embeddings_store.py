@@ -1,6 +1,24 @@
-import json, numpy as np, faiss
+import heapq, json, math, re, numpy as np, faiss
+from collections import Counter
 from pathlib import Path
-from .config import EMBED_MODEL, FAISS_INDEX_PATH, EMBEDDINGS_NPY, DOCS_CHUNKS_JSON
+from .config import EMBED_MODEL, FAISS_INDEX_PATH, EMBEDDINGS_NPY, DOCS_CHUNKS_JSON, BM25_INDEX_JSON
+
+RETRIEVAL_MODES = ("lexical", "dense", "hybrid")
+BM25_K1, BM25_B = 1.5, 0.75
+RRF_K = 60  # reciprocal-rank-fusion constant for hybrid mode
+# Weight of the (score-scaled) lexical term in hybrid mode: the best BM25 match
+# on an exact id/code must outrank a dense neighbour at the same rank
+LEXICAL_WEIGHT = 2.0
+
+# ids (C100037, P1017, U2229), procedure codes (proc_surg) and amounts (4746.93) stay whole
+_TOKEN_RE = re.compile(r"[a-z0-9_]+(?:\.\d+)?")
+# "$4,746.93" -> "4746.93": drop currency signs and thousands separators first
+_CURRENCY_RE = re.compile(r"[$€£₹]")
+_THOUSANDS_RE = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+
+# path -> (mtime_ns, loaded object); avoids re-reading artifacts on every query
+_CACHE = {}
+
 
 def _load_chunks():
     if not DOCS_CHUNKS_JSON.exists():
@@ -8,6 +26,68 @@ def _load_chunks():
     return json.load(open(DOCS_CHUNKS_JSON, "r", encoding="utf-8"))
 
 
+def _cached(path: Path, loader):
+    if not path.exists():
+        raise FileNotFoundError(f"Missing {path}")
+    mtime = path.stat().st_mtime_ns
+    hit = _CACHE.get(path)
+    if hit is None or hit[0] != mtime:
+        hit = _CACHE[path] = (mtime, loader(path))
+    return hit[1]
+
+
+def tokenize(text: str):
+    text = _THOUSANDS_RE.sub("", _CURRENCY_RE.sub("", text.lower()))
+    return _TOKEN_RE.findall(text)
+
+
+def _chunk_terms(chunk):
+    # Index the chunk's ids too, so placeholder/OCR chunks are still findable by claim/provider id
+    return tokenize(f"{chunk['claim_id']} {chunk.get('provider_id') or ''} {chunk['text']}")
+
+
+def build_bm25(chunks):
+    """
+    Inverted index over the chunk store: term -> [[chunk_idx, tf], ...].
+    """
+    postings = {}
+    doc_len = []
+    for i, chunk in enumerate(chunks):
+        tf = Counter(_chunk_terms(chunk))
+        doc_len.append(sum(tf.values()))
+        for term, n in tf.items():
+            postings.setdefault(term, []).append([i, n])
+
+    return {
+        "k1": BM25_K1,
+        "b": BM25_B,
+        "avgdl": (sum(doc_len) / len(doc_len)) if doc_len else 0.0,
+        "doc_len": doc_len,
+        "postings": postings
+    }
+
+
+def bm25_search(bm25, query: str, k=5):
+    """
+    Returns [(chunk_idx, score), ...] best first. Only the posting lists of
+    the query terms are touched.
+    """
+    n = len(bm25["doc_len"])
+    k1, b, avgdl, doc_len = bm25["k1"], bm25["b"], bm25["avgdl"] or 1.0, bm25["doc_len"]
+
+    scores = {}
+    for term in set(tokenize(query)):
+        plist = bm25["postings"].get(term)
+        if not plist:
+            continue
+        idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+        for i, tf in plist:
+            norm = k1 * (1 - b + b * doc_len[i] / avgdl)
+            scores[i] = scores.get(i, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+    return heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+
+
 def build_index():
     """
     Minimal deterministic embedding generator + FAISS index builder.
@@ -25,15 +105,22 @@ def build_index():
     index = faiss.IndexFlatL2(dim)
     index.add(embeddings)
 
+    # Lexical inverted index over the same chunks
+    bm25 = build_bm25(chunks)
+
     # Save
     np.save(EMBEDDINGS_NPY, embeddings)
     faiss.write_index(index, str(FAISS_INDEX_PATH))
+    with open(BM25_INDEX_JSON, "w", encoding="utf-8") as f:
+        json.dump(bm25, f, separators=(",", ":"))
 
     return {
         "chunks": n,
         "dimensions": dim,
+        "bm25_terms": len(bm25["postings"]),
         "embeddings_saved": str(EMBEDDINGS_NPY),
-        "faiss_index_saved": str(FAISS_INDEX_PATH)
+        "faiss_index_saved": str(FAISS_INDEX_PATH),
+        "bm25_index_saved": str(BM25_INDEX_JSON)
     }
 
 
@@ -59,28 +146,81 @@ def load_index():
     }
 
 
-def retrieve(query: str, k=5):
-    """
-    Simple deterministic retrieval based on FAISS.
-    """
+def _query_vector(query: str):
     # deterministic seed based on query
     seed = abs(hash(query)) % (2**32)
     rng = np.random.default_rng(seed)
-    q_vec = rng.normal(size=(384,)).astype("float32") # Use consistent dim 384
+    return rng.normal(size=(384,)).astype("float32") # Use consistent dim 384
 
-    data = load_index()
-    index = data["index"]
-    chunks = data["chunks"]
 
-    qv = q_vec.reshape(1, -1)
-    distances, idxs = index.search(qv, k)
+def retrieve(query: str, k=5, mode="hybrid"):
+    """
+    Retrieval over the chunk store.
+
+    mode="lexical": BM25 posting-list lookup (exact ids, codes, amounts)
+    mode="dense":   FAISS search
+    mode="hybrid":  both, fused by reciprocal rank with lexical hits weighted up
+
+    If the BM25 index hasn't been built yet, hybrid falls back to dense and
+    lexical raises FileNotFoundError.
+    """
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"mode must be one of {RETRIEVAL_MODES}, got '{mode}'")
+    if not BM25_INDEX_JSON.exists():
+        if mode == "lexical":
+            raise FileNotFoundError(f"BM25 index missing: {BM25_INDEX_JSON}; run build_index() first")
+        if mode == "hybrid":
+            mode = "dense"
+
+    chunks = _cached(DOCS_CHUNKS_JSON, lambda p: json.load(open(p, "r", encoding="utf-8")))
+    q_vec = _query_vector(query)
+    depth = k if mode != "hybrid" else max(4 * k, 20)
+
+    dense = []
+    if mode != "lexical":
+        index = _cached(FAISS_INDEX_PATH, lambda p: faiss.read_index(str(p)))
+        distances, idxs = index.search(q_vec.reshape(1, -1), depth)
+        dense = [(int(i), float(d)) for i, d in zip(idxs[0], distances[0]) if i >= 0]
+
+    lexical = []
+    if mode != "dense":
+        bm25 = _cached(BM25_INDEX_JSON, lambda p: json.load(open(p, "r", encoding="utf-8")))
+        lexical = bm25_search(bm25, query, depth)
+
+    if mode == "dense":
+        ranked = [(i, None) for i, _ in dense]
+    elif mode == "lexical":
+        ranked = lexical
+    else:
+        fused = {}
+        # lexical first, so it also wins any remaining ties in nlargest. Each lexical
+        # term is scaled by its BM25 score relative to the best hit, so documents
+        # that only share common words ("invoice", "proc_d") can't ride a dense
+        # neighbour past the exact id match.
+        top = lexical[0][1] if lexical else 1.0
+        for rank, (i, score) in enumerate(lexical):
+            fused[i] = fused.get(i, 0.0) + LEXICAL_WEIGHT * (score / top) / (RRF_K + rank + 1)
+        for rank, (i, _) in enumerate(dense):
+            fused[i] = fused.get(i, 0.0) + 1.0 / (RRF_K + rank + 1)
+        ranked = heapq.nlargest(k, fused.items(), key=lambda kv: kv[1])
+
+    # Every result carries an L2 distance so downstream scoring works in all modes
+    dense_dist = dict(dense)
+    missing = [i for i, _ in ranked[:k] if i not in dense_dist]
+    if missing:
+        embeddings = _cached(EMBEDDINGS_NPY, np.load)
+        for i in missing:
+            dense_dist[i] = float(np.sum((embeddings[i] - q_vec) ** 2))
 
     results = []
-    for idx, dist in zip(idxs[0], distances[0]):
-        results.append({
+    for idx, score in ranked[:k]:
+        res = {
             "doc_id": chunks[idx]['doc_id'],
             "claim_id": chunks[idx]['claim_id'],
             "text": chunks[idx]['text'],
-            "distance": float(dist)
-        })
+            "distance": dense_dist[idx]
+        }
+        if score is not None:
+            res["score"] = float(score)
+        results.append(res)
     return results
@@ -0,0 +1,170 @@
+import hashlib, os, signal, threading, time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from pathlib import Path
+from .config import OCR_BACKEND, OCR_CACHE_DIR, OCR_TIMEOUT_S, OCR_WORKERS
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp"}
+PDF_SUFFIXES = {".pdf"}
+# SIGALRM backstop fires this long after a backend's own timeout, so backends
+# that can clean up after themselves (e.g. kill a tesseract child) get to first
+ALARM_GRACE_S = 5
+
+
+class TesseractExtractor:
+    """
+    Images via pytesseract, PDFs via their text layer (pypdf).
+    Heavy imports happen inside extract() so the module loads without them.
+    """
+    name = "tesseract"
+
+    def extract(self, path: Path, timeout=None) -> str:
+        if path.suffix.lower() in PDF_SUFFIXES:
+            from pypdf import PdfReader
+            return "\n".join(page.extract_text() or "" for page in PdfReader(str(path)).pages)
+
+        import pytesseract
+        from PIL import Image
+        with Image.open(path) as img:
+            try:
+                # pytesseract kills its tesseract child on its own timeout, not on ours
+                return pytesseract.image_to_string(img, timeout=timeout or 0)
+            except RuntimeError as e:
+                if "timeout" in str(e).lower():
+                    raise TimeoutError(str(e)) from e
+                raise
+
+
+class StubExtractor:
+    """
+    Deterministic backend for tests: no OCR, just a line naming the file.
+    """
+    name = "stub"
+
+    def extract(self, path: Path, timeout=None) -> str:
+        return f"[STUB OCR TEXT for {path.name}]"
+
+
+EXTRACTORS = {
+    TesseractExtractor.name: TesseractExtractor,
+    StubExtractor.name: StubExtractor,
+}
+
+
+def get_extractor(name=None):
+    name = name or OCR_BACKEND
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{name}'. Choose from {sorted(EXTRACTORS)}")
+    return EXTRACTORS[name]()
+
+
+def _content_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_path(digest: str, extractor) -> Path:
+    # Backend name is part of the key so swapping backends never serves stale text
+    return OCR_CACHE_DIR / f"{digest}.{extractor.name}.txt"
+
+
+def _on_alarm(signum, frame):
+    raise TimeoutError("extraction timed out")
+
+
+def _extract_one(extractor, path: Path, timeout):
+    """
+    Worker entry point. Returns (text, error). The backend gets the timeout
+    first; SIGALRM (where available) is a backstop so a stuck file frees its
+    slot. The caller's SIGALRM handler is restored afterwards.
+    """
+    use_alarm = (bool(timeout) and hasattr(signal, "SIGALRM")
+                 and threading.current_thread() is threading.main_thread())
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout + ALARM_GRACE_S)
+    try:
+        return extractor.extract(path, timeout=timeout), None
+    except TimeoutError:
+        return None, "timeout"
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def extract_documents(paths, extractor=None, workers=None, timeout=None):
+    """
+    Extract text from image/PDF files across a process pool.
+
+    Results are cached on disk by file content hash, so unchanged files are
+    never re-extracted. Returns ({path: text}, stats); failed files are left
+    out of the dict and counted in stats.
+    """
+    extractor = extractor or get_extractor()
+    workers = workers or OCR_WORKERS
+    timeout = OCR_TIMEOUT_S if timeout is None else timeout
+    OCR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.time()
+    paths = [Path(p) for p in paths]
+    texts, pending, errors = {}, [], {}
+    for p in paths:
+        try:
+            digest = _content_hash(p)
+        except OSError as e:
+            errors[p.name] = f"{type(e).__name__}: {e}"
+            continue
+        cached = _cache_path(digest, extractor)
+        if cached.exists():
+            texts[p] = cached.read_text(encoding="utf-8")
+        else:
+            pending.append((p, cached))
+    cache_hits = len(texts)
+
+    def _store(p, cached, text, err):
+        if err is not None:
+            errors[p.name] = err
+            return
+        texts[p] = text
+        tmp = cached.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(cached)
+
+    used_workers = 1 if workers <= 1 or len(pending) <= 1 else min(workers, len(pending))
+    if used_workers == 1:
+        for p, cached in pending:
+            _store(p, cached, *_extract_one(extractor, p, timeout))
+    else:
+        with ProcessPoolExecutor(max_workers=used_workers) as pool:
+            futures = [(p, cached, pool.submit(_extract_one, extractor, p, timeout)) for p, cached in pending]
+            # Workers time themselves out; only wait with a limit where SIGALRM is missing
+            backstop = None if hasattr(signal, "SIGALRM") else (timeout and timeout + ALARM_GRACE_S)
+            for p, cached, fut in futures:
+                try:
+                    text, err = fut.result(timeout=backstop)
+                except FuturesTimeout:
+                    text, err = None, "timeout"
+                except Exception as e:
+                    text, err = None, f"{type(e).__name__}: {e}"
+                _store(p, cached, text, err)
+
+    elapsed = time.time() - t0
+    extracted = len(texts) - cache_hits
+    stats = {
+        "backend": extractor.name,
+        "files": len(paths),
+        "cache_hits": cache_hits,
+        "extracted": extracted,
+        "failed": len(errors),
+        "timeouts": sum(1 for e in errors.values() if e == "timeout"),
+        "errors": errors,
+        "workers": used_workers if pending else 0,
+        "elapsed_s": round(elapsed, 3),
+        "extracted_per_s": round(extracted / elapsed, 2) if elapsed > 0 else None,
+    }
+    return texts, stats
@@ -1,6 +1,65 @@
-import pandas as pd
+import numpy as np, pandas as pd
 from .config import PROCESSED_DIR
 
+VELOCITY_WINDOWS = (7, 30, 90)  # days
+BURST_MIN_CLAIMS = 3            # ignore "bursts" smaller than this
+BURST_SHARE = 0.5               # ...and at least this share of the entity's 90d claims fell in the last 7d
+AMOUNT_SPIKE_FACTOR = 4        # 7d amount vs the entity's weekly amount over the rest of its 90d window
+
+def rolling_window_features(claims, key, windows=VELOCITY_WINDOWS, prefix=None):
+    """
+    Trailing-window claim counts and amount sums per `key` (provider_id / patient_id).
+
+    Sorts once by (key, date), then finds each row's window start with a
+    vectorized binary search over a composite (key, day) array and reads
+    counts/sums off prefix sums: O(n log n) time, O(n) memory, no per-row filtering.
+    Windows are inclusive of the claim's own day, e.g. 7d = [date-6, date].
+    Rows with a missing `key` get zeros rather than being pooled into one entity.
+    """
+    prefix = prefix or key.split('_')[0]
+    cols = [f'{prefix}_{kind}_{w}d' for w in windows for kind in ('claims', 'amount')]
+    valid = claims[key].notna()
+    if not valid.all():
+        out = pd.DataFrame(0, index=claims.index, columns=cols)
+        if valid.any():
+            out = rolling_window_features(claims[valid], key, windows, prefix).reindex(claims.index, fill_value=0)
+        return out
+
+    codes = pd.factorize(claims[key])[0].astype(np.int64)
+    days = claims['claim_date'].values.astype('datetime64[D]').astype(np.int64)
+    days = days - days.min()
+    span = int(days.max()) + max(windows) + 1   # keeps windows from crossing into the previous key
+
+    order = np.lexsort((days, codes))
+    composite = codes[order] * span + days[order]
+    csum = np.concatenate(([0.0], np.cumsum(claims['amount'].values[order])))
+    # all claims on the same day as the current one are in its window
+    right = np.searchsorted(composite, composite, side='right')
+
+    out = pd.DataFrame(index=claims.index)
+    for w in windows:
+        left = np.searchsorted(composite, composite - (w - 1), side='left')
+        count = np.empty(len(order), dtype=np.int64)
+        total = np.empty(len(order), dtype=np.float64)
+        count[order] = right - left
+        total[order] = csum[right] - csum[left]
+        out[f'{prefix}_claims_{w}d'] = count
+        out[f'{prefix}_amount_{w}d'] = total
+    return out
+
+def _burst_flag(feats, prefix):
+    # several claims in a week that make up most of the entity's own 90-day volume
+    # (a steady high-volume entity is provider_high_volume's job, not a burst)
+    c7, c90 = feats[f'{prefix}_claims_7d'], feats[f'{prefix}_claims_90d']
+    return (c7 >= BURST_MIN_CLAIMS) & (c7 >= BURST_SHARE * c90)
+
+def _amount_spike_flag(feats, prefix):
+    # several claims in a week whose dollars far outpace the entity's own weekly
+    # rate over the rest of its 90-day window; one large claim is is_amount_outlier's job
+    c7, a7, a90 = feats[f'{prefix}_claims_7d'], feats[f'{prefix}_amount_7d'], feats[f'{prefix}_amount_90d']
+    weekly_baseline = (a90 - a7) * 7 / (90 - 7)
+    return (c7 >= BURST_MIN_CLAIMS) & (a7 > AMOUNT_SPIKE_FACTOR * weekly_baseline)
+
 def compute_basic_features_and_stage1():
     claims = pd.read_csv(PROCESSED_DIR / "claims.csv")
 
@@ -24,7 +83,16 @@ def compute_basic_features_and_stage1():
     median_claims = claims['provider_total_claims'].median()
     claims['provider_high_volume'] = claims['provider_total_claims'] > (2 * median_claims)
 
-    claims['stage1_score'] = claims[['is_amount_outlier','is_duplicate','provider_high_volume']].astype(int).sum(axis=1)
+    claims = claims.join(rolling_window_features(claims, 'provider_id'))
+    claims = claims.join(rolling_window_features(claims, 'patient_id'))
+    claims['provider_burst'] = _burst_flag(claims, 'provider')
+    claims['patient_burst'] = _burst_flag(claims, 'patient')
+    claims['provider_amount_spike'] = _amount_spike_flag(claims, 'provider')
+    claims['patient_amount_spike'] = _amount_spike_flag(claims, 'patient')
+
+    stage1_flags = ['is_amount_outlier','is_duplicate','provider_high_volume',
+                    'provider_burst','patient_burst','provider_amount_spike','patient_amount_spike']
+    claims['stage1_score'] = claims[stage1_flags].astype(int).sum(axis=1)
 
     out = PROCESSED_DIR / "claims_stage1.parquet"
     claims.to_parquet(out, index=False)
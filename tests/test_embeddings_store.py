@@ -0,0 +1,50 @@
+import json
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+
+from src import embeddings_store as es
+
+
+CHUNKS = [
+    {"doc_id": f"C{100000 + i}_invoice.txt_chunk0", "claim_id": f"C{100000 + i}", "provider_id": f"P{1000 + i % 7}",
+     "text": f"Invoice ID: C{100000 + i}\nProcedure: PROC_{'ABCD'[i % 4]}\nAmount: {1000 + i * 37.25:.2f}"}
+    for i in range(200)
+]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    for name, fname in (("DOCS_CHUNKS_JSON", "docs_metadata.json"), ("FAISS_INDEX_PATH", "faiss_index.idx"),
+                        ("EMBEDDINGS_NPY", "embeddings.npy"), ("BM25_INDEX_JSON", "bm25_index.json")):
+        monkeypatch.setattr(es, name, tmp_path / fname)
+    monkeypatch.setattr(es, "_CACHE", {})
+    es.DOCS_CHUNKS_JSON.write_text(json.dumps(CHUNKS))
+    es.build_index()
+    return CHUNKS
+
+
+@pytest.mark.parametrize("claim_id", ["C100037", "C100150", "C100199"])
+def test_hybrid_ranks_exact_claim_id_first(store, claim_id):
+    assert es.retrieve(claim_id, k=5)[0]["claim_id"] == claim_id
+    query = f"Invoice for claim {claim_id} amount 1000 procedure proc_d"
+    assert es.retrieve(query, k=5, mode="hybrid")[0]["claim_id"] == claim_id
+
+
+def test_amount_with_currency_and_thousands_separator(store):
+    assert es.tokenize("$4,746.93 and 1,234,567") == ["4746.93", "and", "1234567"]
+    hits = es.retrieve("$1,037.25", k=1, mode="lexical")
+    assert hits and hits[0]["claim_id"] == "C100001"
+
+
+def test_every_mode_returns_distance(store):
+    for mode in es.RETRIEVAL_MODES:
+        assert all(isinstance(r["distance"], float) for r in es.retrieve("C100042", k=3, mode=mode))
+
+
+def test_missing_bm25_index(store):
+    es.BM25_INDEX_JSON.unlink()
+    with pytest.raises(FileNotFoundError, match="build_index"):
+        es.retrieve("C100037", mode="lexical")
+    assert len(es.retrieve("C100037", k=3)) == 3  # hybrid falls back to dense
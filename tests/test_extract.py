@@ -0,0 +1,90 @@
+import json
+import time
+import pytest
+
+from src import docs, extract
+from src.config import DOCS_RAW_DIR
+from src.extract import StubExtractor, extract_documents
+
+
+class SleepyExtractor:
+    name = "sleepy"
+
+    def extract(self, path, timeout=None):
+        time.sleep(30)
+
+
+class RenamedStub(StubExtractor):
+    name = "stub2"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract, "OCR_CACHE_DIR", tmp_path / "ocr_cache")
+    return tmp_path / "ocr_cache"
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i in range(3):
+        p = tmp_path / f"C10000{i}_invoice.png"
+        p.write_bytes(f"fake image {i}".encode())
+        paths.append(p)
+    return paths
+
+
+def test_second_run_is_all_cache_hits(images):
+    texts, stats = extract_documents(images, extractor=StubExtractor(), workers=1)
+    assert stats["extracted"] == 3 and stats["cache_hits"] == 0
+    assert texts[images[0]] == f"[STUB OCR TEXT for {images[0].name}]"
+
+    texts2, stats2 = extract_documents(images, extractor=StubExtractor(), workers=1)
+    assert stats2["cache_hits"] == 3 and stats2["extracted"] == 0
+    assert stats2["workers"] == 0
+    assert texts2 == texts
+
+
+def test_cache_key_includes_content_and_backend(images, cache_dir):
+    extract_documents(images, extractor=StubExtractor(), workers=1)
+    _, stats = extract_documents(images, extractor=RenamedStub(), workers=1)
+    assert stats["cache_hits"] == 0 and stats["extracted"] == 3
+
+    images[0].write_bytes(b"changed")
+    _, stats = extract_documents(images, extractor=StubExtractor(), workers=1)
+    assert stats["cache_hits"] == 2 and stats["extracted"] == 1
+    assert len(list(cache_dir.glob("*.stub.txt"))) == 4
+
+
+def test_failed_files_are_counted_not_returned(images, tmp_path):
+    missing = tmp_path / "missing.png"
+    texts, stats = extract_documents(images + [missing], extractor=StubExtractor(), workers=1)
+    assert missing not in texts and len(texts) == 3
+    assert stats["files"] == 4 and stats["failed"] == 1 and "missing.png" in stats["errors"]
+
+
+def test_per_file_timeout(images, monkeypatch):
+    monkeypatch.setattr(extract, "ALARM_GRACE_S", 0)
+    t0 = time.time()
+    texts, stats = extract_documents(images[:1], extractor=SleepyExtractor(), workers=1, timeout=1)
+    assert time.time() - t0 < 10
+    assert texts == {}
+    assert stats["timeouts"] == 1 and stats["errors"] == {images[0].name: "timeout"}
+
+
+def test_workers_reports_workers_used(images):
+    _, stats = extract_documents(images, extractor=StubExtractor(), workers=8)
+    assert stats["workers"] == 3 and stats["extracted"] == 3
+
+    _, stats = extract_documents(images[:1], extractor=RenamedStub(), workers=8)
+    assert stats["workers"] == 1
+
+
+def test_prepare_docs_extracts_every_png(tmp_path, monkeypatch):
+    monkeypatch.setattr(docs, "DOCS_CHUNKS_JSON", tmp_path / "docs_metadata.json")
+    res = docs.prepare_docs_from_raw(DOCS_RAW_DIR / "docs_metadata.json", extractor=StubExtractor())
+
+    assert res["extraction"]["files"] == 92 and res["extraction"]["failed"] == 0
+    chunks = json.load(open(tmp_path / "docs_metadata.json"))
+    assert not [c for c in chunks if c["text"].startswith("[PLACEHOLDER TEXT")]
+    assert sum(c["text"].startswith("[STUB OCR TEXT") for c in chunks) == 92
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import VELOCITY_WINDOWS, rolling_window_features
+
+
+def _brute_force(claims, key, w):
+    counts, sums = [], []
+    for _, row in claims.iterrows():
+        m = ((claims[key] == row[key]) & (claims['claim_date'] <= row['claim_date'])
+             & (claims['claim_date'] > row['claim_date'] - pd.Timedelta(days=w)))
+        counts.append(int(m.sum()))
+        sums.append(float(claims.loc[m, 'amount'].sum()))
+    return counts, sums
+
+
+@pytest.fixture
+def claims():
+    day = pd.Timestamp('2025-01-01')
+    rows = [
+        # same-day claims
+        ('P1', 0, 100.0), ('P1', 0, 50.0),
+        # 7/30/90 edges relative to day 0: day w-1 is in the window, day w is not
+        ('P1', 6, 10.0), ('P1', 7, 20.0), ('P1', 29, 30.0), ('P1', 30, 40.0),
+        ('P1', 89, 5.0), ('P1', 90, 7.0),
+        # entity boundary: P2's claims must never count towards P1 and vice versa
+        ('P2', 0, 1000.0), ('P2', 3, 2000.0), ('P2', 3, 3000.0),
+        ('P3', 200, 1.0),
+    ]
+    df = pd.DataFrame(rows, columns=['provider_id', 'day', 'amount'])
+    df['claim_date'] = day + pd.to_timedelta(df.pop('day'), unit='D')
+    # shuffled, with a non-default index, to check results land on the right rows
+    return df.sample(frac=1, random_state=0).set_index(np.arange(100, 100 + len(df)))
+
+
+@pytest.mark.parametrize("w", VELOCITY_WINDOWS)
+def test_matches_brute_force(claims, w):
+    feats = rolling_window_features(claims, 'provider_id')
+    counts, sums = _brute_force(claims, 'provider_id', w)
+    assert feats[f'provider_claims_{w}d'].tolist() == counts
+    assert np.allclose(feats[f'provider_amount_{w}d'], sums)
+
+
+def test_window_edges(claims):
+    feats = rolling_window_features(claims, 'provider_id').join(claims)
+    p1 = feats[feats.provider_id == 'P1']
+    by_day = p1.set_index(p1.claim_date.dt.dayofyear - 1)
+    assert by_day.loc[0, 'provider_claims_7d'].tolist() == [2, 2]
+    assert by_day.loc[6, 'provider_claims_7d'] == 3    # day 6 still sees day 0
+    assert by_day.loc[7, 'provider_claims_7d'] == 2    # day 7 does not
+    assert by_day.loc[29, 'provider_claims_30d'] == 5  # day 29 still sees day 0
+    assert by_day.loc[30, 'provider_claims_30d'] == 4  # day 30 does not
+    assert by_day.loc[89, 'provider_claims_90d'] == 7  # day 89 still sees day 0
+    assert by_day.loc[90, 'provider_claims_90d'] == 6  # day 90 does not
+
+
+def test_missing_keys_get_zeros(claims):
+    claims.loc[claims.index[:3], 'provider_id'] = None
+    feats = rolling_window_features(claims, 'provider_id')
+    missing = claims['provider_id'].isna()
+    assert (feats[missing] == 0).all().all()
+
+    kept = claims[~missing]
+    counts, _ = _brute_force(kept, 'provider_id', 30)
+    assert feats.loc[kept.index, 'provider_claims_30d'].tolist() == counts